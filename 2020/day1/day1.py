@@ -31,49 +31,133 @@
 # In your expense report, what is the product of the three entries that sum to 2020?
 
 import sys
+from collections import Counter
+from functools import cached_property
+from math import prod
 
-TARGET_SUM = 2020
+DEFAULT_TARGET_SUM = 2020
+DEFAULT_TERM_COUNTS = [2, 3]
 
 
 def main():
+    # usage: day1.py <input file> [target sum] [term count ...]
+    #        day1.py <input file> --queries <query file>
+    # a query file holds one "<target sum> <term count>" pair per line
     input_file = sys.argv[1]
     try:
         with open(input_file) as file_reader:
             numbers = [int(line) for line in file_reader.readlines()]
-            print(target_sum_product_2(numbers))
-            print(target_sum_product_3(numbers))
+
+        if len(sys.argv) > 3 and sys.argv[2] == "--queries":
+            answer_queries(build_expense_index(numbers), sys.argv[3])
+            return
+
+        target = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TARGET_SUM
+        term_counts = [int(arg) for arg in sys.argv[3:]] or DEFAULT_TERM_COUNTS
+        index = build_expense_index(numbers)
+        for k in term_counts:
+            print(prod(find_indexed_k_sum(index, target, k)))
     except Exception as error:
         print(error)
 
 
-def target_sum_product_2(numbers):
-    numbers_length = len(numbers)
-    for i in range(numbers_length):
-        number_i = numbers[i]
-        if number_i > TARGET_SUM:
-            continue
-        for j in range(i + 1, numbers_length):
-            number_j = numbers[j]
-            if number_i + number_j == TARGET_SUM:
-                return number_i * number_j
-    raise Exception(f"No numbers in given list add up to {TARGET_SUM}")
-
-
-def target_sum_product_3(numbers):
-    numbers_length = len(numbers)
-    for i in range(numbers_length):
-        number_i = numbers[i]
-        if number_i > TARGET_SUM:
-            continue
-        for j in range(i + 1, numbers_length):
-            number_j = numbers[j]
-            if number_i + number_j > TARGET_SUM:
+def answer_queries(index, query_file):
+    # the ledger is parsed and indexed once; each query line is answered
+    # and printed as soon as it is read so results stream out
+    with open(query_file) as query_reader:
+        for line in query_reader:
+            query = line.strip()
+            if not query:
                 continue
-            for k in range(j + 1, numbers_length):
-                number_k = numbers[k]
-                if number_i + number_j + number_k == TARGET_SUM:
-                    return number_i * number_j * number_k
-    raise Exception(f"No numbers in given list add up to {TARGET_SUM}")
+            # a bad query only fails its own line, the rest of the batch goes on
+            try:
+                target, k = (int(value) for value in query.split())
+                answer = prod(find_indexed_k_sum(index, target, k))
+            except Exception as error:
+                answer = error
+            print(f"{query}: {answer}", flush=True)
+
+
+def target_sum_product(numbers, target, k):
+    return prod(find_k_sum(numbers, target, k))
+
+
+def find_k_sum(numbers, target, k):
+    return find_indexed_k_sum(build_expense_index(numbers), target, k)
+
+
+def build_expense_index(numbers):
+    return ExpenseIndex(numbers)
+
+
+# the ledger's value -> count index and sorted values, each only built the
+# first time a query needs it (2-sums never pay for the sort) and then reused
+class ExpenseIndex:
+    def __init__(self, numbers):
+        self.numbers = numbers
+
+    @cached_property
+    def value_counts(self):
+        return Counter(self.numbers)
+
+    @cached_property
+    def sorted_numbers(self):
+        return sorted(self.numbers)
+
+
+def find_indexed_k_sum(index, target, k):
+    if k < 1:
+        raise Exception(f"Cannot find a sum of {k} numbers")
+
+    # k == 2 is the hot path: one pass over a value -> count index is O(n);
+    # everything wider fixes the leading terms over the sorted values and
+    # closes with a two-pointer sweep, which makes 3-sum O(n^2)
+    if k <= 2:
+        terms = find_hashed_sum(index.value_counts, target, k)
+    else:
+        terms = find_sorted_sum(index.sorted_numbers, 0, target, k)
+
+    if terms is None:
+        raise Exception(f"No {k} numbers in given list add up to {target}")
+    return terms
+
+
+def find_hashed_sum(value_counts, target, k):
+    if k == 1:
+        return (target,) if value_counts[target] > 0 else None
+
+    for number in value_counts:
+        complement = target - number
+        # the same entry can only be used once, so a number can only
+        # pair with itself if it shows up more than once in the list
+        needed = 2 if complement == number else 1
+        if value_counts.get(complement, 0) >= needed:
+            return (number, complement)
+    return None
+
+
+def find_sorted_sum(sorted_numbers, start, target, k):
+    if k == 2:
+        low, high = start, len(sorted_numbers) - 1
+        while low < high:
+            pair_sum = sorted_numbers[low] + sorted_numbers[high]
+            if pair_sum == target:
+                return (sorted_numbers[low], sorted_numbers[high])
+            if pair_sum < target:
+                low += 1
+            else:
+                high -= 1
+        return None
+
+    for i in range(start, len(sorted_numbers) - k + 1):
+        number_i = sorted_numbers[i]
+        # equal leading terms would only repeat the search we just did
+        if i > start and number_i == sorted_numbers[i - 1]:
+            continue
+        terms = find_sorted_sum(sorted_numbers, i + 1, target - number_i, k - 1)
+        if terms is not None:
+            return (number_i,) + terms
+    return None
 
 
 if __name__ == "__main__":
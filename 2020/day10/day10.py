@@ -131,109 +131,127 @@
 
 # What is the total number of distinct ways you can arrange the adapters to connect the charging outlet to your device?
 
-import copy
+from array import array
+from collections import deque
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_JOLTAGE_STEP = 3
+
 
 def main():
+    # usage: day10.py <input file> [max joltage step]
     input_file = sys.argv[1]
     try:
+        max_step = int(sys.argv[2]) if len(sys.argv) > 2 else MAX_JOLTAGE_STEP
         with open(input_file) as file_reader:
             adapter_joltages = [int(line) for line in file_reader.readlines()]
 
-            joltage_differences = find_adapter_joltage_differences(adapter_joltages)
+            if np is not None:
+                difference_counts = numpy_count_joltage_differences(adapter_joltages)
+            else:
+                difference_counts = count_joltage_differences(adapter_joltages)
 
             # part 1:
             # find the product of the number of adapters with a 1 joltage difference between them
             # multiplied by the number of adapters with a 3 joltage difference between them
             # (this is neither silly nor confusing)
-            print(joltage_differences.count(1) * joltage_differences.count(3))
+            print(difference_counts[1] * difference_counts[3])
 
             # part 2:
             # lol
-            print(count_all_valid_adapter_arrangements(adapter_joltages))
+            print(count_all_valid_adapter_arrangements(adapter_joltages, max_step))
     except Exception as error:
         print(error)
 
 
-def build_sorted_adapters(adapter_joltages):
-    # prepend the power outlet (joltage value: 0) to the copy
-    sorted_adapter_joltages = [0] + copy.copy(adapter_joltages)
-    sorted_adapter_joltages.sort()
+def build_sorted_adapters(adapter_joltages, device_step=MAX_JOLTAGE_STEP):
+    # joltages are small non-negative integers, so counting sort them:
+    # the power outlet (joltage value: 0) comes first as the lowest value
+    joltage_counts = build_joltage_counts(adapter_joltages)
+    sorted_adapter_joltages = [0]
+    for joltage, count in enumerate(joltage_counts):
+        sorted_adapter_joltages.extend([joltage] * count)
 
     # append the device adapter to the list of sorted adapter joltages
-    # (joltage value: 3 + max adapter value)
-    sorted_adapter_joltages.append(sorted_adapter_joltages[-1] + 3)
+    # (joltage value: device_step + max adapter value)
+    sorted_adapter_joltages.append(sorted_adapter_joltages[-1] + device_step)
 
     return sorted_adapter_joltages
 
 
-def find_adapter_joltage_differences(adapter_joltages):
-    sorted_adapter_joltages = build_sorted_adapters(adapter_joltages)
+# how many adapters there are of each joltage, indexed by joltage
+def build_joltage_counts(adapter_joltages):
+    joltage_counts = array("l", [0]) * (max(adapter_joltages, default=0) + 1)
+    for adapter_joltage in adapter_joltages:
+        joltage_counts[adapter_joltage] += 1
+    return joltage_counts
 
-    # find the joltage difference between every adapter and its next neighbor
-    differences = []
-    prev_adapter_joltage = sorted_adapter_joltages[0]
-    for adapter_joltage in sorted_adapter_joltages[1:]:
-        differences.append(adapter_joltage - prev_adapter_joltage)
+
+# histogram of the joltage differences between neighboring adapters in the
+# chain (outlet and device included), indexed by difference
+# a single pass over the joltage counts; nothing gets sorted
+def count_joltage_differences(adapter_joltages):
+    joltage_counts = build_joltage_counts(adapter_joltages)
+
+    # the device is always 3 above the highest adapter
+    difference_counts = [0] * 4
+    prev_adapter_joltage = 0
+    for adapter_joltage, count in enumerate(joltage_counts):
+        if count == 0:
+            continue
+        difference = adapter_joltage - prev_adapter_joltage
+        if difference >= len(difference_counts):
+            difference_counts.extend([0] * (difference + 1 - len(difference_counts)))
+        difference_counts[difference] += 1
+        # duplicate adapters sit right next to each other in the chain
+        difference_counts[0] += count - 1
         prev_adapter_joltage = adapter_joltage
+    difference_counts[3] += 1
 
-    return differences
+    return difference_counts
+
+
+# same histogram as count_joltage_differences, built with numpy
+def numpy_count_joltage_differences(adapter_joltages):
+    joltage_counts = np.bincount(np.asarray(adapter_joltages, dtype=np.int64))
+    sorted_adapter_joltages = np.repeat(np.arange(len(joltage_counts)), joltage_counts)
+    # the device is always 3 above the highest adapter (or the outlet, if none)
+    device_joltage = max(len(joltage_counts) - 1, 0) + 3
+    chain = np.concatenate(([0], sorted_adapter_joltages, [device_joltage]))
+    return np.bincount(np.diff(chain), minlength=4).tolist()
 
 
 # calculate all possible valid adapter arrangements
-# the difference between adjacent adapters must be >= 1 and <= 3
+# the difference between adjacent adapters must be >= 1 and <= max_step
 # adapters must be connected in ascending order
-def count_all_valid_adapter_arrangements(adapter_joltages):
-    sorted_adapter_joltages = build_sorted_adapters(adapter_joltages)
-    valid_arrangements = 1
-    all_option_paths = []
-    for index, adapter_joltage in enumerate(sorted_adapter_joltages):
-        # find the difference between the adapter and all subsequent adapters
-        # stop when we hit an invalid one
-        # this will give us all the possible path options for each individual adapter
-        options = []
-        difference = 0
-        next_index = index + 1
-
-        while difference <= 3 and next_index < len(sorted_adapter_joltages):
-            difference = sorted_adapter_joltages[next_index] - adapter_joltage
-            if difference <= 3:
-                options.append(difference)
-                next_index += 1
-        if len(options):
-            all_option_paths.append(options)
-
-    # we can use our list of path options to math out all the possible path combinations
-    option_accumulator = 0
-    prev_options_count = 0
-    for options in all_option_paths:
-        options_count = len(options)
-
-        # if we only have one option, our branching options have converged;
-        # reset all of the intermittent accumulator stuff and
-        # multiply the valid arrangements by our running permutation total
-        if options_count == 1:
-            if option_accumulator > 0:
-                valid_arrangements *= option_accumulator
-                option_accumulator = 0
-                prev_options_count = 0
-            continue
+def count_all_valid_adapter_arrangements(adapter_joltages, max_step=MAX_JOLTAGE_STEP):
+    # the device is rated max_step above the highest adapter, so it can
+    # always be reached from there whatever the step
+    sorted_adapter_joltages = build_sorted_adapters(adapter_joltages, max_step)
+
+    # the ways to reach an adapter are the sum of the ways to reach every adapter
+    # within max_step joltage below it; keep those adapters in a sliding window
+    # along with a running total of their ways, so each adapter costs O(1)
+    # (python ints don't overflow, so huge counts stay exact)
+    window = deque([(sorted_adapter_joltages[0], 1)])
+    window_ways = 1
+    ways = 1
+    for adapter_joltage in sorted_adapter_joltages[1:]:
+        while window and window[0][0] < adapter_joltage - max_step:
+            _, evicted_ways = window.popleft()
+            window_ways -= evicted_ways
+
+        ways = window_ways
+        window.append((adapter_joltage, ways))
+        window_ways += ways
 
-        # here's the magic math:
-        # if our previous option set was > 1, we need to add those total
-        # options together to account for all of the possible paths they represent
-        # if the previous options set was larger than our current options set, we need
-        # to offset our path options by the difference between them, because that
-        # number of path options has already been captured by the PREVIOUS options
-        # (or you know, magic)
-        offset = 0
-        if prev_options_count > options_count:
-            offset = prev_options_count - options_count
-        option_accumulator += options_count - offset
-        prev_options_count = len(options)
-
-    return valid_arrangements
+    # the last entry is the device, so its ways are every valid arrangement
+    return ways
 
 
 if __name__ == "__main__":
@@ -119,8 +119,14 @@
 # Given the new visibility method and the rule change for occupied seats becoming empty, once equilibrium is reached, how many seats end up occupied?
 
 
+from array import array
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 ADJACENT_DIRECTION_MODS = [
     (-1, 0),
     (1, 0),
@@ -139,12 +145,30 @@ OCCUPIED_SEAT_TOLERANCE_FOR_RULE_VERSION = {
 
 
 def main():
+    # usage: day11.py <input file> [--incremental | --list]
     input_file = sys.argv[1]
     try:
         with open(input_file) as file_reader:
             seat_map = [list(line.rstrip()) for line in file_reader.readlines()]
-            print(count_all_occupied_seats(get_stable_seat_map(seat_map, 1)))
-            print(count_all_occupied_seats(get_stable_seat_map(seat_map, 2)))
+
+            # the original list-of-lists engine, kept as the reference the
+            # faster engines are checked against
+            if "--list" in sys.argv[2:]:
+                print(count_all_occupied_seats(get_stable_seat_map(seat_map, 1)))
+                print(count_all_occupied_seats(get_stable_seat_map(seat_map, 2)))
+                return
+
+            # without numpy, the incremental engine is the fast path
+            if "--incremental" in sys.argv[2:] or np is None:
+                print(count_stable_occupied_seats_incrementally(seat_map, 1))
+                print(count_stable_occupied_seats_incrementally(seat_map, 2))
+                return
+
+            # with numpy, run the whole-grid array engine instead
+            seat_grids = build_seat_grids(seat_map)
+            print(int(get_stable_occupied_grid(seat_grids, 1).sum()))
+            print(int(get_stable_occupied_grid(seat_grids, 2).sum()))
+
     except Exception as error:
         print(error)
 
@@ -286,5 +310,164 @@ def seat_is_out_of_bounds(seat_map, row_index, seat_index):
     )
 
 
+# numpy seat grids: (seats, occupied), both int8 arrays the shape of the map
+# seats is 1 wherever there is a seat (and 0 for floor), occupied is 1 wherever
+# a seat is taken; floor is never occupied, so it never counts as a neighbor
+def build_seat_grids(seat_map):
+    char_grid = np.array(seat_map)
+    seats = (char_grid != ".").astype(np.int8)
+    occupied = (char_grid == "#").astype(np.int8)
+    return (seats, occupied)
+
+
+# same rules as apply_rules_to_seat_map, applied to the whole grid at once
+# until no seat changes; returns the final occupied grid
+def get_stable_occupied_grid(seat_grids, rule_version):
+    seats, occupied = seat_grids
+    occupied_seat_tolerance = OCCUPIED_SEAT_TOLERANCE_FOR_RULE_VERSION[rule_version]
+
+    if rule_version == 2:
+        # every seat's line of sight is looked up once, up front; after that a
+        # generation only gathers 8 occupancy values per cell
+        neighbor_table = np.frombuffer(
+            build_neighbor_table(seats.tolist(), rule_version), dtype=np.int32
+        ).reshape(-1, len(ADJACENT_DIRECTION_MODS))
+        # the sentinel index points one past the grid, at a seat that's always empty
+        flat_occupied = np.zeros(occupied.size + 1, dtype=np.int8)
+
+    while True:
+        if rule_version == 1:
+            relevant_occupied_seats = count_occupied_adjacent_grid(occupied)
+        else:
+            flat_occupied[:-1] = occupied.ravel()
+            relevant_occupied_seats = (
+                flat_occupied[neighbor_table].sum(axis=1).reshape(occupied.shape)
+            )
+
+        # empty seats with no relevant occupied seats fill up, occupied seats
+        # stay taken until too many relevant seats are occupied
+        next_occupied = (
+            (seats == 1)
+            & np.where(
+                occupied == 1,
+                relevant_occupied_seats < occupied_seat_tolerance,
+                relevant_occupied_seats == 0,
+            )
+        ).astype(np.int8)
+
+        if np.array_equal(next_occupied, occupied):
+            return occupied
+        occupied = next_occupied
+
+
+def count_occupied_adjacent_grid(occupied):
+    # pad with a ring of empty floor, then add up the grid shifted once in
+    # each of the 8 directions
+    height, width = occupied.shape
+    padded = np.pad(occupied, 1)
+    occupied_count = np.zeros(occupied.shape, dtype=np.int8)
+    for row_mod, seat_mod in ADJACENT_DIRECTION_MODS:
+        occupied_count += padded[
+            1 + row_mod : 1 + row_mod + height, 1 + seat_mod : 1 + seat_mod + width
+        ]
+    return occupied_count
+
+
+# flat int32 table of each cell's relevant neighbor in all 8 directions
+# (ADJACENT_DIRECTION_MODS order): cell (row, seat) is index row * width + seat,
+# and its neighbors are table[8 * index : 8 * index + 8]
+# rule version 1 -> the adjacent cell, rule version 2 -> the first seat in the
+# line of sight; directions with no seat at all hold the sentinel, len(cells)
+# seat_map only needs to tell floor (".", or 0) apart from seats
+def build_neighbor_table(seat_map, rule_version):
+    height = len(seat_map)
+    width = len(seat_map[0]) if height else 0
+    sentinel = height * width
+    direction_count = len(ADJACENT_DIRECTION_MODS)
+    is_seat = [seat != "." and seat != 0 for row in seat_map for seat in row]
+
+    neighbor_table = array("i", [sentinel]) * (sentinel * direction_count)
+    for direction, (row_mod, seat_mod) in enumerate(ADJACENT_DIRECTION_MODS):
+        # walk the map so that the cell one step along the direction is always
+        # done first; a floor cell's line of sight is then just copied over
+        row_order = range(height) if row_mod <= 0 else range(height - 1, -1, -1)
+        seat_order = range(width) if seat_mod <= 0 else range(width - 1, -1, -1)
+        for row_index in row_order:
+            next_row_index = row_index + row_mod
+            if not 0 <= next_row_index < height:
+                continue
+            for seat_index in seat_order:
+                next_seat_index = seat_index + seat_mod
+                if not 0 <= next_seat_index < width:
+                    continue
+                next_index = next_row_index * width + next_seat_index
+                if is_seat[next_index]:
+                    visible_index = next_index
+                elif rule_version == 2:
+                    visible_index = neighbor_table[
+                        next_index * direction_count + direction
+                    ]
+                else:
+                    continue
+                neighbor_table[
+                    (row_index * width + seat_index) * direction_count + direction
+                ] = visible_index
+
+    return neighbor_table
+
+
+# same rules as apply_rules_to_seat_map, but each round only re-evaluates the
+# seats that could have changed: the ones whose relevant neighbors changed last
+# round (neighbors are symmetric, so that's the neighbors of the changed seats)
+# occupancy lives in two flat buffers that swap roles every round instead of
+# a new map being built; returns the occupied seat count once stable
+def count_stable_occupied_seats_incrementally(seat_map, rule_version):
+    occupied_seat_tolerance = OCCUPIED_SEAT_TOLERANCE_FOR_RULE_VERSION[rule_version]
+    neighbor_table = build_neighbor_table(seat_map, rule_version)
+    direction_count = len(ADJACENT_DIRECTION_MODS)
+
+    # one extra, always empty, cell at the end for the sentinel to point at
+    flat_seat_map = [seat for row in seat_map for seat in row]
+    occupied = bytearray(seat == "#" for seat in flat_seat_map) + b"\0"
+    next_occupied = bytearray(occupied)
+    sentinel = len(flat_seat_map)
+    seats_to_check = [index for index, seat in enumerate(flat_seat_map) if seat != "."]
+
+    while seats_to_check:
+        changed_seats = []
+        for index in seats_to_check:
+            neighbors_start = index * direction_count
+            relevant_occupied_seats = sum(
+                occupied[neighbor_index]
+                for neighbor_index in neighbor_table[
+                    neighbors_start : neighbors_start + direction_count
+                ]
+            )
+            if occupied[index]:
+                if relevant_occupied_seats >= occupied_seat_tolerance:
+                    next_occupied[index] = 0
+                    changed_seats.append(index)
+            elif relevant_occupied_seats == 0:
+                next_occupied[index] = 1
+                changed_seats.append(index)
+
+        # swap the buffers, then bring the new spare one up to date; only the
+        # seats that just changed differ between them
+        occupied, next_occupied = next_occupied, occupied
+        for index in changed_seats:
+            next_occupied[index] = occupied[index]
+
+        seats_to_check = set()
+        for index in changed_seats:
+            neighbors_start = index * direction_count
+            seats_to_check.add(index)
+            seats_to_check.update(
+                neighbor_table[neighbors_start : neighbors_start + direction_count]
+            )
+        seats_to_check.discard(sentinel)
+
+    return sum(occupied)
+
+
 if __name__ == "__main__":
     main()
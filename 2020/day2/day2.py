@@ -36,15 +36,42 @@
 # How many passwords are valid according to the new interpretation of the policies?
 
 import sys
+import timeit
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BENCHMARK_RUNS = 5
+STREAM_CHUNK_SIZE = 1 << 16
 
 
 def main():
+    # usage: day2.py <input file> [--benchmark | --stream]
     input_file = sys.argv[1]
+    benchmark = "--benchmark" in sys.argv[2:]
+    # streaming never holds more than one chunk of the file, so it is
+    # also the path we take when numpy is missing
+    stream = "--stream" in sys.argv[2:] or (np is None and not benchmark)
     try:
         with open(input_file) as file_reader:
+            if stream:
+                passwords = stream_password_tuples(file_reader)
+                char_count_valid, position_valid = count_valid_passwords(passwords)
+                print(char_count_valid)
+                print(position_valid)
+                return
+
             passwords = [parse_input_line(line) for line in file_reader.readlines()]
-            print(valid_char_count_password_count(passwords))
-            print(valid_postion_password_count(passwords))
+
+        if benchmark:
+            benchmark_policies(passwords)
+            return
+
+        columns = build_password_columns(passwords)
+        print(columnar_char_count_password_count(columns))
+        print(columnar_position_password_count(columns))
     except Exception as error:
         print(error)
 
@@ -64,6 +91,40 @@ def parse_input_line(line):
     return (char_min, char_max, target_char, password)
 
 
+def stream_lines(file_reader, chunk_size=STREAM_CHUNK_SIZE):
+    # read fixed-size chunks and carry any partial last line over into the next
+    partial_line = ""
+    while True:
+        chunk = file_reader.read(chunk_size)
+        if not chunk:
+            break
+        lines = (partial_line + chunk).split("\n")
+        partial_line = lines.pop()
+        yield from lines
+    if partial_line:
+        yield partial_line
+
+
+def stream_password_tuples(file_reader):
+    return (
+        parse_input_line(line) for line in stream_lines(file_reader) if line.strip()
+    )
+
+
+def count_valid_passwords(password_tuples):
+    # evaluates both policies per row, so a single pass over a stream
+    # of password tuples is enough for both counts
+    char_count_valid = 0
+    position_valid = 0
+    for password_tuple in password_tuples:
+        char_min, char_max, target_char, password = password_tuple
+        if char_min <= password.count(target_char) <= char_max:
+            char_count_valid += 1
+        if is_valid_position_password(password_tuple):
+            position_valid += 1
+    return (char_count_valid, position_valid)
+
+
 def valid_char_count_password_count(password_tuples):
     valid_passwords = 0
     for password_tuple in password_tuples:
@@ -96,5 +157,90 @@ def is_valid_position_password(password_tuple):
     return password[target_position_2 - 1] == target_char
 
 
+def build_password_columns(password_tuples):
+    if not password_tuples:
+        return (
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.uint32),
+            np.zeros((0, 1), dtype=np.uint32),
+        )
+
+    char_mins, char_maxes, target_chars, passwords = zip(*password_tuples)
+
+    # passwords become a fixed-width matrix of code points, one row per
+    # password, right-padded with zeros (which never match a target char);
+    # working in code points rather than encoded bytes keeps every column
+    # lined up with a character position, even for non-ASCII passwords
+    password_array = np.array(passwords, dtype=str)
+    password_width = password_array.dtype.itemsize // 4
+    password_matrix = password_array.view(np.uint32).reshape(-1, password_width)
+
+    return (
+        np.array(char_mins, dtype=np.int64),
+        np.array(char_maxes, dtype=np.int64),
+        np.array(target_chars, dtype="U1").view(np.uint32),
+        password_matrix,
+    )
+
+
+def columnar_char_count_password_count(columns):
+    char_mins, char_maxes, target_chars, password_matrix = columns
+    target_char_counts = (password_matrix == target_chars[:, None]).sum(axis=1)
+    valid = (target_char_counts >= char_mins) & (target_char_counts <= char_maxes)
+    return int(valid.sum())
+
+
+def columnar_position_password_count(columns):
+    target_positions_1, target_positions_2, target_chars, password_matrix = columns
+    return int(
+        (
+            columnar_char_at_position(password_matrix, target_positions_1, target_chars)
+            ^ columnar_char_at_position(
+                password_matrix, target_positions_2, target_chars
+            )
+        ).sum()
+    )
+
+
+def columnar_char_at_position(password_matrix, target_positions, target_chars):
+    # positions are not zero indexed; positions past the end of a password
+    # land in the zero padding (or are clipped to it) and never match
+    password_width = password_matrix.shape[1]
+    columns = np.clip(target_positions - 1, 0, password_width - 1)
+    in_range = (target_positions >= 1) & (target_positions <= password_width)
+    chars = password_matrix[np.arange(len(password_matrix)), columns]
+    return in_range & (chars == target_chars)
+
+
+def benchmark_policies(password_tuples):
+    loop_time = timeit.timeit(
+        lambda: (
+            valid_char_count_password_count(password_tuples),
+            valid_postion_password_count(password_tuples),
+        ),
+        number=BENCHMARK_RUNS,
+    )
+    print(f"loop: {loop_time / BENCHMARK_RUNS:.6f}s per run")
+
+    if np is None:
+        print("columnar: numpy is not installed")
+        return
+
+    columns = build_password_columns(password_tuples)
+    build_time = timeit.timeit(
+        lambda: build_password_columns(password_tuples), number=BENCHMARK_RUNS
+    )
+    columnar_time = timeit.timeit(
+        lambda: (
+            columnar_char_count_password_count(columns),
+            columnar_position_password_count(columns),
+        ),
+        number=BENCHMARK_RUNS,
+    )
+    print(f"columnar build: {build_time / BENCHMARK_RUNS:.6f}s per run")
+    print(f"columnar: {columnar_time / BENCHMARK_RUNS:.6f}s per run")
+
+
 if __name__ == "__main__":
     main()
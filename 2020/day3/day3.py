@@ -72,12 +72,31 @@
 
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 TREE = "#"
+LINE_ENDING_BYTES = (ord("\r"), ord("\n"))
 SLOPES = [(3, 1), (1, 1), (5, 1), (7, 1), (1, 2)]
 
 def main():
     input_file = sys.argv[1]
     try:
+        # with numpy the map stays memory-mapped and is never read in as strings
+        if np is not None:
+            tree_counts = count_trees_in_grid_for_slopes(
+                load_tree_grid(input_file), SLOPES
+            )
+
+            # part 1: the first slope is 3 right, 1 down
+            print(tree_counts[0])
+
+            # part 2: multiply the counts for every slope in the SLOPES list
+            print(product_of_tree_counts(tree_counts))
+            return
+
         with open(input_file) as file_reader:
             tree_map = [line.rstrip() for line in file_reader.readlines()]
 
@@ -90,13 +109,42 @@ def main():
         print(error)
 
 
-def product_of_all_slopes(tree_map):
+def product_of_all_slopes(tree_map, slopes=SLOPES):
+    return product_of_tree_counts(count_trees_for_slopes(tree_map, slopes))
+
+
+def product_of_tree_counts(tree_counts):
     product = 1
-    for slope in SLOPES:
-        product *= count_trees(tree_map, slope)
+    for tree_count in tree_counts:
+        product *= tree_count
     return product
 
 
+def count_trees_for_slopes(tree_map, slopes):
+    map_height = len(tree_map)
+    row_length = len(tree_map[0])
+
+    # every slope keeps its own column cursor and the map is swept top to
+    # bottom once; a row is only looked at by the slopes that land on it
+    cols = [0] * len(slopes)
+    tree_counts = [0] * len(slopes)
+
+    for row in range(map_height):
+        map_row = None
+        for i, (right, down) in enumerate(slopes):
+            if row % down != 0:
+                continue
+            if map_row is None:
+                map_row = tree_map[row]
+            if map_row[cols[i]] == TREE:
+                tree_counts[i] += 1
+
+            # wrap around!
+            cols[i] = (cols[i] + right) % row_length
+
+    return tree_counts
+
+
 def count_trees(tree_map, slope):
     map_height = len(tree_map)
     row_length = len(tree_map[0])
@@ -125,5 +173,53 @@ def count_trees(tree_map, slope):
     return tree_count
 
 
+def load_tree_grid(input_file):
+    raw_map = np.memmap(input_file, dtype=np.uint8, mode="r")
+
+    # every row has the same width, so the file is a grid with one (or two,
+    # for \r\n) line ending bytes at the end of each row; view it in place
+    # as (rows, width) without copying, the line endings are just never indexed
+    row_length = int(np.argmax(raw_map == ord("\n")))
+    if row_length == 0 and raw_map[0] != ord("\n"):
+        # a single row with no line ending at all
+        return raw_map.reshape(1, -1)
+    row_stride = row_length + 1
+    if row_length > 0 and raw_map[row_length - 1] == ord("\r"):
+        row_length -= 1
+    if row_length == 0:
+        raise Exception("Tree map starts with an empty row")
+
+    # only count complete rows, ignoring any trailing blank lines, so the
+    # strided view can never reach past the end of the mapped file
+    map_length = len(raw_map)
+    while map_length > 0 and raw_map[map_length - 1] in LINE_ENDING_BYTES:
+        map_length -= 1
+    map_height = (map_length - row_length) // row_stride + 1
+    if (map_height - 1) * row_stride + row_length > len(raw_map):
+        raise Exception("Tree map rows run past the end of the file")
+
+    return np.lib.stride_tricks.as_strided(
+        raw_map,
+        shape=(map_height, row_length),
+        strides=(row_stride * raw_map.strides[0], raw_map.strides[0]),
+        writeable=False,
+    )
+
+
+def count_trees_in_grid_for_slopes(tree_grid, slopes):
+    return [count_trees_in_grid(tree_grid, slope) for slope in slopes]
+
+
+def count_trees_in_grid(tree_grid, slope):
+    map_height, row_length = tree_grid.shape
+    right, down = slope
+
+    # gather every cell on the path in one go; the map repeats along rows,
+    # so columns wrap with a modulo instead of a running cursor
+    rows = np.arange(0, map_height, down)
+    cols = (np.arange(len(rows)) * right) % row_length
+    return int(np.count_nonzero(tree_grid[rows, cols] == ord(TREE)))
+
+
 if __name__ == "__main__":
     main()
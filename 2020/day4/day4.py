@@ -60,102 +60,173 @@
 # Your job is to count the passports where all required fields are both present and valid according to the above rules.
 # Count the number of valid passports - those that have all required fields and valid values. Continue to treat cid as optional. In your batch file, how many passports are valid?
 
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+import mmap
 import re
 import sys
 
 REQUIRED_PASSPORT_FIELDS = set(["byr", "iyr", "eyr", "hgt", "hcl", "ecl", "pid"])
 VALID_EYE_COLORS = set(["amb", "blu", "brn", "gry", "grn", "hzl", "oth"])
 
+NUMBER_PATTERN = re.compile(r"\d+")
+HEIGHT_PATTERN = re.compile(r"(\d+)(in|cm)")
+HAIR_COLOR_PATTERN = re.compile(r"#[\da-f]{6}")
+PASSPORT_ID_PATTERN = re.compile(r"\d{9}")
+# passports are separated by a blank (or whitespace-only) line
+RECORD_SEPARATOR_PATTERN = re.compile(rb"\n[ \t\r]*\n")
+
+RECORDS_PER_CHUNK = 10000
+# chunks handed to the pool but not yet counted, per worker
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
 
 def main():
+    # usage: day4.py <input file> [--workers N]
     input_file = sys.argv[1]
     try:
-        with open(input_file) as file_reader:
-            raw_passports = file_reader.readlines()
-            print(count_valid_passports(raw_passports))
-            print(count_valid_passports(raw_passports, True))
+        workers = 0
+        if "--workers" in sys.argv[2:]:
+            workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
+        records = iter_passport_records(input_file)
+        if workers > 1:
+            present_count, valid_count = count_valid_passports_in_parallel(
+                records, workers
+            )
+        else:
+            present_count, valid_count = count_valid_passports(records)
+        print(present_count)
+        print(valid_count)
     except Exception as error:
         print(error)
 
 
-def count_valid_passports(raw_passports, validate_field_values=False):
+def iter_passport_records(input_file):
+    # the file is memory-mapped and records are sliced out one at a time,
+    # so only the record being handed out is ever decoded into memory
+    with open(input_file, "rb") as file_reader:
+        if file_reader.seek(0, 2) == 0:
+            return
+        with mmap.mmap(file_reader.fileno(), 0, access=mmap.ACCESS_READ) as batch:
+            record_start = 0
+            for separator in RECORD_SEPARATOR_PATTERN.finditer(batch):
+                yield batch[record_start : separator.start()].decode()
+                record_start = separator.end()
+            yield batch[record_start:].decode()
+
+
+def count_valid_passports(passport_records):
+    # a single pass counts both passports with every required field present
+    # and passports whose required fields are also all valid
+    present_passport_count = 0
+    valid_passport_count = 0
+    for record in passport_records:
+        has_fields, has_valid_fields = evaluate_passport(record)
+        if has_fields:
+            present_passport_count += 1
+        if has_valid_fields:
+            valid_passport_count += 1
+
+    return (present_passport_count, valid_passport_count)
+
+
+def count_valid_passports_in_parallel(passport_records, workers):
+    present_passport_count = 0
     valid_passport_count = 0
-    curr_passport_valid_fields = set([])
-    for raw_line in raw_passports:
-        line = raw_line.rstrip()
-        if len(line) == 0:
-            # hit a new line; if all fields for current
-            if has_all_required_fields(curr_passport_valid_fields):
-                valid_passport_count += 1
-            # reset curr_passport_fields for next passport
-            curr_passport_valid_fields = set([])
-
-        fields = line.split()
-        for field in fields:
-            field_parts = field.split(":")
-            field_name = field_parts[0]
-            field_value = field_parts[1]
-            # only consider required passport fields - anything else is irrelevant
-            if field_name in REQUIRED_PASSPORT_FIELDS:
-                # validate the field value if asked to do so
-                if not validate_field_values or is_valid_field_value(
-                    field_name, field_value
-                ):
-                    curr_passport_valid_fields.add(field_name)
-
-    # check the last passport (if file does not end w/ newline)
-    if len(curr_passport_valid_fields) > 0 and has_all_required_fields(
-        curr_passport_valid_fields
-    ):
-        valid_passport_count += 1
-
-    return valid_passport_count
+
+    # only a bounded number of chunks is ever pulled off the record stream
+    # ahead of the workers: once that many are in flight, wait on the oldest
+    # before reading the next, so the batch is never all held in memory
+    max_chunks_in_flight = workers * CHUNKS_IN_FLIGHT_PER_WORKER
+    pending_counts = deque()
+    with Pool(workers) as pool:
+        for chunk in chunk_records(passport_records):
+            if len(pending_counts) >= max_chunks_in_flight:
+                present_count, valid_count = pending_counts.popleft().get()
+                present_passport_count += present_count
+                valid_passport_count += valid_count
+            pending_counts.append(pool.apply_async(count_valid_passports, (chunk,)))
+
+        while pending_counts:
+            present_count, valid_count = pending_counts.popleft().get()
+            present_passport_count += present_count
+            valid_passport_count += valid_count
+
+    return (present_passport_count, valid_passport_count)
+
+
+def chunk_records(passport_records, chunk_size=RECORDS_PER_CHUNK):
+    passport_records = iter(passport_records)
+    while True:
+        chunk = list(islice(passport_records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_passport(record):
+    present_fields = set([])
+    valid_fields = set([])
+    for field in record.split():
+        field_name, _, field_value = field.partition(":")
+        # only consider required passport fields - anything else is irrelevant
+        if field_name in REQUIRED_PASSPORT_FIELDS:
+            present_fields.add(field_name)
+            if FIELD_VALIDATORS[field_name](field_value):
+                valid_fields.add(field_name)
+
+    return (
+        has_all_required_fields(present_fields),
+        has_all_required_fields(valid_fields),
+    )
 
 
 def is_valid_field_value(field_name, field_value):
-    try:
-        if field_name == "byr":
-            # four digits; at least 1920 and at most 2002
-            byr = int(field_value)
-            return byr >= 1920 and byr <= 2002
-        if field_name == "iyr":
-            # four digits; at least 2010 and at most 2020
-            iyr = int(field_value)
-            return iyr >= 2010 and iyr <= 2020
-        if field_name == "eyr":
-            # four digits; at least 2020 and at most 2030
-            eyr = int(field_value)
-            return eyr >= 2020 and eyr <= 2030
-        if field_name == "hgt":
-            # a number followed by either cm or in
-            height_match = re.match(r"^(\d+)(in|cm)$", field_value)
-
-            # no match? get outta here
-            if height_match == None:
-                return False
-
-            height_value, height_unit = height_match.groups()
-            height_as_int = int(height_value)
-            if height_unit == "in":
-                # if in, the number must be at least 59 and at most 76
-                return height_as_int >= 59 and height_as_int <= 76
-            if height_unit == "cm":
-                # if cm, the number must be at least 150 and at most 193
-                return height_as_int >= 150 and height_as_int <= 193
-        if field_name == "hcl":
-            # a # followed by exactly six characters 0-9 or a-f
-            return re.match(r"^#[\da-f]{6}$", field_value)
-        if field_name == "ecl":
-            # exactly one of: amb blu brn gry grn hzl oth
-            return field_value in VALID_EYE_COLORS
-        if field_name == "pid":
-            # a nine-digit number, including leading zeroes
-            return re.match(r"^\d{9}$", field_value)
-    except Exception as error:
-        print(error)
+    validator = FIELD_VALIDATORS.get(field_name)
+    return validator is not None and validator(field_value)
+
+
+def is_number_in_range(field_value, minimum, maximum):
+    return (
+        NUMBER_PATTERN.fullmatch(field_value) is not None
+        and minimum <= int(field_value) <= maximum
+    )
+
+
+def is_valid_height(field_value):
+    # a number followed by either cm or in
+    height_match = HEIGHT_PATTERN.fullmatch(field_value)
+
+    # no match? get outta here
+    if height_match is None:
         return False
 
-    return False
+    height_value, height_unit = height_match.groups()
+    height_as_int = int(height_value)
+    if height_unit == "in":
+        # if in, the number must be at least 59 and at most 76
+        return 59 <= height_as_int <= 76
+    # if cm, the number must be at least 150 and at most 193
+    return 150 <= height_as_int <= 193
+
+
+FIELD_VALIDATORS = {
+    # four digits; at least 1920 and at most 2002
+    "byr": lambda value: is_number_in_range(value, 1920, 2002),
+    # four digits; at least 2010 and at most 2020
+    "iyr": lambda value: is_number_in_range(value, 2010, 2020),
+    # four digits; at least 2020 and at most 2030
+    "eyr": lambda value: is_number_in_range(value, 2020, 2030),
+    "hgt": is_valid_height,
+    # a # followed by exactly six characters 0-9 or a-f
+    "hcl": lambda value: HAIR_COLOR_PATTERN.fullmatch(value) is not None,
+    # exactly one of: amb blu brn gry grn hzl oth
+    "ecl": lambda value: value in VALID_EYE_COLORS,
+    # a nine-digit number, including leading zeroes
+    "pid": lambda value: PASSPORT_ID_PATTERN.fullmatch(value) is not None,
+}
 
 
 def has_all_required_fields(passport_fields):
@@ -45,82 +45,101 @@
 
 # What is the ID of your seat?
 
-import math
 import sys
 
-MAX_ROW = 127
-MAX_COL = 7
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 LOWER_DIRECTIONS = ["F", "L"]
 UPPER_DIRECTIONS = ["B", "R"]
+BOARDING_PASS_LENGTH = 10
+
+# a boarding pass is just a 10-bit binary seat ID written with letters:
+# the row is the top 7 bits and the column the bottom 3, so row * 8 + col
+# falls out of reading the whole pass as one number
+SEAT_ID_BITS = str.maketrans(
+    {
+        **{direction: "0" for direction in LOWER_DIRECTIONS},
+        **{direction: "1" for direction in UPPER_DIRECTIONS},
+    }
+)
 
 
 def main():
     input_file = sys.argv[1]
     try:
-        with open(input_file) as file_reader:
-            seat_ids = [
-                calculate_seat_id(boarding_pass.rstrip())
-                for boarding_pass in file_reader.readlines()
-            ]
-
-            # part 1: find highest seat ID in list of boarding passes
-            print(max(seat_ids))
-
-            # part 2: find the missing (your) seat
-            print(find_missing_seat(seat_ids))
+        if np is not None:
+            seat_ids = decode_seat_ids(load_boarding_pass_matrix(input_file)).tolist()
+        else:
+            with open(input_file) as file_reader:
+                seat_ids = [
+                    calculate_seat_id(boarding_pass.rstrip())
+                    for boarding_pass in file_reader.readlines()
+                ]
+
+        # part 1: find highest seat ID in list of boarding passes
+        print(max(seat_ids))
+
+        # part 2: find the missing (your) seat
+        print(find_missing_seat(seat_ids))
     except Exception as error:
         print(error)
 
 
 def find_missing_seat(seat_ids):
-    seat_ids.sort()
-    prev_seat = seat_ids[0]
-    curr_seat = seat_ids[0]
-
     # seat_ids is a full set of integers with one missing
+    free_seats = find_free_seats(seat_ids, min(seat_ids), max(seat_ids))
+    if not free_seats:
+        return None
+
+    # if there are several free seats in a row, ours is the one right
+    # before the next occupied seat
+    missing_seat = free_seats[0]
+    for free_seat in free_seats[1:]:
+        if free_seat != missing_seat + 1:
+            break
+        missing_seat = free_seat
+    return missing_seat
+
+
+def find_free_seats(seat_ids, lowest_seat_id, highest_seat_id):
+    # mark every occupied seat in a bitmap over the requested range, then read
+    # the gaps back out; linear in the manifest plus the range, no sorting,
+    # and the caller's list is left alone
+    occupied = bytearray(highest_seat_id - lowest_seat_id + 1)
     for seat_id in seat_ids:
-        prev_seat = curr_seat
-        curr_seat = seat_id
-        if curr_seat - prev_seat > 1:
-            return curr_seat - 1
+        if lowest_seat_id <= seat_id <= highest_seat_id:
+            occupied[seat_id - lowest_seat_id] = 1
+
+    return [
+        lowest_seat_id + offset
+        for offset, is_occupied in enumerate(occupied)
+        if not is_occupied
+    ]
 
 
 def calculate_seat_id(boarding_pass):
-    # row directions: first 7 chars of boarding pass
-    # col directions: last 3 chars of boarding pass
-    row_directions = boarding_pass[0:7]
-    col_directions = boarding_pass[7:]
-
-    row = binary_search_location(0, MAX_ROW, row_directions, 0)
-    col = binary_search_location(0, MAX_COL, col_directions, 0)
-
-    # every seat also has a unique seat ID: multiply the row by 8, then add the column
-    seat_id = (row * 8) + col
-    return seat_id
-
-
-# binary search for a row or column location, using a string of directions
-# the order of the directions will determine whether the search continues
-# in the lower or upper half of the possible row/column locations
-def binary_search_location(lower, upper, directions, direction_pointer):
-    next_direction = directions[direction_pointer]
-    # if we've reached the end of our directions, return the location
-    # based on the final direction in the string (either the lower or upper half location)
-    if direction_pointer == len(directions) - 1:
-        if next_direction in LOWER_DIRECTIONS:
-            return lower
-        return upper
-
-    midpoint = (lower + upper) / 2
-    if next_direction in LOWER_DIRECTIONS:
-        return binary_search_location(
-            lower, math.floor(midpoint), directions, direction_pointer + 1
-        )
-
-    return binary_search_location(
-        math.ceil(midpoint), upper, directions, direction_pointer + 1
-    )
+    return int(boarding_pass.translate(SEAT_ID_BITS), 2)
+
+
+def load_boarding_pass_matrix(input_file):
+    raw_passes = np.fromfile(input_file, dtype=np.uint8)
+
+    # every pass has the same length, so the file is a byte matrix with the
+    # line ending(s) as trailing columns; pad a missing final newline back in
+    if raw_passes[-1] != ord("\n"):
+        raw_passes = np.append(raw_passes, np.uint8(ord("\n")))
+    row_stride = int(np.argmax(raw_passes == ord("\n"))) + 1
+    return raw_passes.reshape(-1, row_stride)[:, :BOARDING_PASS_LENGTH]
+
+
+def decode_seat_ids(boarding_pass_matrix):
+    upper_codes = np.array([ord(direction) for direction in UPPER_DIRECTIONS])
+    bits = np.isin(boarding_pass_matrix, upper_codes)
+    place_values = 1 << np.arange(BOARDING_PASS_LENGTH - 1, -1, -1)
+    return bits @ place_values
 
 
 if __name__ == "__main__":
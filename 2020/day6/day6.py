@@ -55,19 +55,33 @@
 # For each group, count the number of questions to which everyone answered "yes".
 
 import sys
+import timeit
+import tracemalloc
+
+BENCHMARK_RUNS = 5
+
+# each question a-z gets one bit of a 26-bit answer mask
+QUESTION_BITS = {chr(ord("a") + i): 1 << i for i in range(26)}
+ALL_QUESTIONS_MASK = (1 << 26) - 1
 
 
 def main():
+    # usage: day6.py <input file> [--benchmark]
     input_file = sys.argv[1]
     try:
         with open(input_file) as file_reader:
-            grouped_custom_forms = group_custom_forms_by_party(file_reader.readlines())
+            # groups are read lazily, one at a time, straight off the file
+            grouped_custom_forms = group_custom_forms_by_party(file_reader)
 
-            # part 1: find the count of total unique 'yes' answers in each group
-            print(sum_all_unique_yes_answers(grouped_custom_forms))
+            if "--benchmark" in sys.argv[2:]:
+                benchmark_yes_answer_sums(list(grouped_custom_forms))
+                return
 
+            # part 1: find the count of total unique 'yes' answers in each group
             # part 2: find the count of total questions where everyone in a group answered 'yes' to the question
-            print(sum_all_unanimous_yes_answers(grouped_custom_forms))
+            unique_yes_sum, unanimous_yes_sum = sum_yes_answers(grouped_custom_forms)
+            print(unique_yes_sum)
+            print(unanimous_yes_sum)
     except Exception as error:
         print(error)
 
@@ -75,22 +89,21 @@ def main():
 # group custom forms by travel party
 # each party member records their 'yes' answers on separate lines
 # different parties are separated by new lines
+# groups are yielded as soon as they are complete, so only one is held at a time
 def group_custom_forms_by_party(raw_input):
-    grouped_custom_forms = []
     custom_form_group = []
     for line in raw_input:
         clean_line = line.rstrip()
         if len(clean_line) == 0:
-            grouped_custom_forms.append(custom_form_group)
+            if len(custom_form_group) > 0:
+                yield custom_form_group
             custom_form_group = []
         else:
             custom_form_group.append(clean_line)
 
-    # append the last group (if file doesn't end in new line)
+    # yield the last group (if file doesn't end in new line)
     if len(custom_form_group) > 0:
-        grouped_custom_forms.append(custom_form_group)
-
-    return grouped_custom_forms
+        yield custom_form_group
 
 
 # sum all of the unique questions that had a 'yes' answer in each group
@@ -129,5 +142,54 @@ def sum_all_unanimous_yes_answers(grouped_custom_forms):
     return unanimous_yes_sum
 
 
+# sum both the unique and the unanimous 'yes' answers in a single pass
+# union of a party's answers is an OR of their masks, unanimity is an AND
+def sum_yes_answers(grouped_custom_forms):
+    unique_yes_sum = 0
+    unanimous_yes_sum = 0
+    for custom_form_group in grouped_custom_forms:
+        any_yes = 0
+        every_yes = ALL_QUESTIONS_MASK
+        for answer_group in custom_form_group:
+            answer_mask = encode_answers(answer_group)
+            any_yes |= answer_mask
+            every_yes &= answer_mask
+
+        unique_yes_sum += any_yes.bit_count()
+        if custom_form_group:
+            unanimous_yes_sum += every_yes.bit_count()
+
+    return (unique_yes_sum, unanimous_yes_sum)
+
+
+def encode_answers(answer_group):
+    answer_mask = 0
+    for answer in answer_group:
+        answer_mask |= QUESTION_BITS[answer]
+    return answer_mask
+
+
+def benchmark_yes_answer_sums(grouped_custom_forms):
+    approaches = [
+        (
+            "set/dict",
+            lambda: (
+                sum_all_unique_yes_answers(grouped_custom_forms),
+                sum_all_unanimous_yes_answers(grouped_custom_forms),
+            ),
+        ),
+        ("bitmask", lambda: sum_yes_answers(grouped_custom_forms)),
+    ]
+    for name, approach in approaches:
+        run_time = timeit.timeit(approach, number=BENCHMARK_RUNS) / BENCHMARK_RUNS
+
+        tracemalloc.start()
+        approach()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{name}: {run_time:.6f}s per run, peak {peak_memory} bytes allocated")
+
+
 if __name__ == "__main__":
     main()
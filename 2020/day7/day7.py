@@ -52,120 +52,236 @@
 # dark violet bags contain no other bags.
 # In this example, a single shiny gold bag must contain 126 other bags.
 
+from array import array
+from collections import deque
 import re
 import sys
 
+# rule format:
+# <color word> <color word> bags contain <number> <color word> <color word> bag, <...> .
+BAG_COLOR_PATTERN = re.compile(r"([a-z]+ [a-z]+) bags contain")
+# contents rule format:
+# <number> <color word> <color word> bag(s)
+# we only care about the number and the color words
+CONTENT_RULE_PATTERN = re.compile(r"(\d+) ([a-z]+ [a-z]+) bags?")
+# marks a bag whose contents are still being counted, to catch cyclic rules
+BAG_COUNT_IN_PROGRESS = -1
+
 
 def main():
+    # usage: day7.py <input file> [--serve]
+    # in serve mode, every line on stdin is a bag color to answer for
     input_file = sys.argv[1]
     try:
         with open(input_file) as file_reader:
-            all_bag_rules = build_bag_rules(file_reader.readlines())
+            bag_graph = build_bag_graph(file_reader)
+
+            if "--serve" in sys.argv[2:]:
+                serve_bag_queries(bag_graph, sys.stdin)
+                return
 
             # part 1: count all bags that can contain at least 1 of the target color bag (shiny gold)
-            print(count_bags_that_can_contain_target(all_bag_rules, "shiny gold"))
+            print(count_bags_that_can_contain_target(bag_graph, "shiny gold"))
 
             # part 2: count all bags that a target bag MUST contain
-            print(count_required_bag_contents(all_bag_rules, "shiny gold"))
+            print(count_required_bag_contents(bag_graph, "shiny gold"))
 
     except Exception as error:
         print(error)
 
 
-def build_bag_rules(raw_bag_rules):
-    # bag dict format:
-    # { <bag color>: { bag rules } }
-    bags_with_rules = {}
+# bag graph format:
+# (color_ids, contents, containers)
+# color_ids maps every bag color to a dense integer ID (0, 1, 2, ...), and
+# contents/containers are the rules as CSR adjacency arrays over those IDs:
+# (offsets, targets, counts), where the edges of bag i are
+# targets[offsets[i]:offsets[i + 1]] with matching counts
+# contents points from a bag to the bags it holds, containers the other way
+def build_bag_graph(raw_bag_rules):
+    color_ids = {}
+    bag_ids = array("l")
+    child_ids = array("l")
+    child_counts = array("q")
 
     for raw_rule in raw_bag_rules:
-        # rule format:
-        # <color word> <color word> bags contain <number> <color word> <color word> bag, <...> .
-
-        # bag color -> first two words
-        bag_color = re.match(r"^([a-z]+ [a-z]+) bags contain", raw_rule)[1]
+        bag_color_match = BAG_COLOR_PATTERN.match(raw_rule)
+        if bag_color_match is None:
+            continue
+        bag_id = intern_color(color_ids, bag_color_match[1])
 
         # contents rules -> everything from the fifth word on
-        bags_with_rules[bag_color] = build_content_rules(raw_rule)
-
-    return bags_with_rules
-
-
-def build_content_rules(raw_bag_rule_line):
-    # contents rule format:
-    # <number> <color word> <color word> bag(s)
-    # we only care about the number and the color words
-    raw_content_rules = re.finditer(r"((\d+) ([a-z]+ [a-z]+)) (?:bags?)", raw_bag_rule_line)
-
-    # build a rules object in the form: { "color word": bag count }
-    content_rules = {}
-    for rule in raw_content_rules:
-        match_groups = rule.groups()
-        bag_count = int(match_groups[1])
-        color = match_groups[2]
-        content_rules[color] = bag_count
-
-    return content_rules
-
-
-# given a set of color-coordinated bag rules and a target color, count how many
+        for rule in CONTENT_RULE_PATTERN.finditer(raw_rule, bag_color_match.end()):
+            bag_ids.append(bag_id)
+            child_ids.append(intern_color(color_ids, rule[2]))
+            child_counts.append(int(rule[1]))
+
+    bag_count = len(color_ids)
+    return (
+        color_ids,
+        build_csr(bag_count, bag_ids, child_ids, child_counts),
+        build_csr(bag_count, child_ids, bag_ids, child_counts),
+    )
+
+
+def intern_color(color_ids, color):
+    color_id = color_ids.get(color)
+    if color_id is None:
+        color_id = color_ids[color] = len(color_ids)
+    return color_id
+
+
+# counting sort the edges by source ID into (offsets, targets, counts)
+def build_csr(node_count, sources, targets, counts):
+    offsets = array("l", [0] * (node_count + 1))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(node_count):
+        offsets[i + 1] += offsets[i]
+
+    next_slot = offsets[:-1]
+    sorted_targets = array("l", [0] * len(targets))
+    sorted_counts = array("q", [0] * len(counts))
+    for source, target, count in zip(sources, targets, counts):
+        slot = next_slot[source]
+        sorted_targets[slot] = target
+        sorted_counts[slot] = count
+        next_slot[source] = slot + 1
+
+    return (offsets, sorted_targets, sorted_counts)
+
+
+# given the bag graph and a target color, count how many
 # bags can contain at least one bag of that color
-def count_bags_that_can_contain_target(all_bag_rules, target_color):
-    bag_total = 0
-    for bag_color in all_bag_rules:
-        bag_total += evaluate_bag_and_child_bags(target_color, all_bag_rules, bag_color)
-
-    return bag_total
-
-
-# determine if the target color bag can be contained in any given bag or any one of its children
-def evaluate_bag_and_child_bags(target_color, all_bag_rules, curr_color):
-    curr_bag_rules = all_bag_rules[curr_color]
-    if not curr_bag_rules:
-        return 0
-
-    if target_color in curr_bag_rules:
-        return 1
-
-    for color in curr_bag_rules:
-        # in this case, we only care about ANY child bag being able to hold a target color bag
-        # so we can return as soon as we find that case
-        if evaluate_bag_and_child_bags(target_color, all_bag_rules, color) > 0:
-            return 1
-
-    return 0
-
-# given a set of color-coordinated bag rules and a target color, count how many
+def count_bags_that_can_contain_target(bag_graph, target_color):
+    color_ids, _, (offsets, containers, _) = bag_graph
+
+    # walk outwards from the target through its containers; every bag
+    # is visited at most once, no matter how many paths lead to it
+    seen = bytearray(len(color_ids))
+    seen_count = 0
+    bags_to_visit = deque([color_ids[target_color]])
+    while bags_to_visit:
+        bag_id = bags_to_visit.popleft()
+        for container_id in containers[offsets[bag_id] : offsets[bag_id + 1]]:
+            if not seen[container_id]:
+                seen[container_id] = 1
+                seen_count += 1
+                bags_to_visit.append(container_id)
+
+    return seen_count
+
+
+# given the bag graph and a target color, count how many
 # bags the target bag must contain (hint: it has lots of nested child bags)
-def count_required_bag_contents(all_bag_rules, target_color):
-    total_contained_bags = 0
-    target_bag_rules = all_bag_rules[target_color]
-
-    for child_bag_color in target_bag_rules:
-        child_bag_count = target_bag_rules[child_bag_color]
-        total_contained_bags += child_bag_count + (
-            child_bag_count
-            * count_bag_and_child_bags(target_color, all_bag_rules, child_bag_color)
+def count_required_bag_contents(bag_graph, target_color, contained_bag_counts=None):
+    color_ids, (offsets, children, child_counts), _ = bag_graph
+
+    # contained_bag_counts memoizes the bags inside each bag ID (None until
+    # counted, BAG_COUNT_IN_PROGRESS while its children are being counted), so
+    # shared subtrees are only ever counted once; pass the same list in to
+    # reuse it across several target colors
+    if contained_bag_counts is None:
+        contained_bag_counts = [None] * len(color_ids)
+
+    # iterative post-order DFS so deeply nested rules can't hit the recursion limit
+    target_id = color_ids[target_color]
+    bags_to_count = [target_id]
+    while bags_to_count:
+        bag_id = bags_to_count[-1]
+        bag_count = contained_bag_counts[bag_id]
+        start, end = offsets[bag_id], offsets[bag_id + 1]
+
+        # first visit: queue up the children, which all get counted before
+        # this bag comes back to the top of the stack
+        if bag_count is None:
+            contained_bag_counts[bag_id] = BAG_COUNT_IN_PROGRESS
+            for child_id in children[start:end]:
+                child_count = contained_bag_counts[child_id]
+                if child_count == BAG_COUNT_IN_PROGRESS:
+                    raise Exception("Bag rules contain a cycle")
+                if child_count is None:
+                    bags_to_count.append(child_id)
+            continue
+
+        # second visit: every child is counted
+        if bag_count == BAG_COUNT_IN_PROGRESS:
+            contained_bag_counts[bag_id] = sum(
+                child_counts[edge] * (1 + contained_bag_counts[children[edge]])
+                for edge in range(start, end)
+            )
+        bags_to_count.pop()
+
+    return contained_bag_counts[target_id]
+
+
+# answer "<color>" queries with "<color>: <bags that can hold it> <bags inside it>"
+def serve_bag_queries(bag_graph, queries):
+    color_ids = bag_graph[0]
+    holder_counts, contained_bag_counts = precompute_bag_answers(bag_graph)
+
+    for query in queries:
+        color = query.strip()
+        if not color:
+            continue
+        color_id = color_ids.get(color)
+        if color_id is None:
+            print(f"{color}: unknown bag color", flush=True)
+        else:
+            print(
+                f"{color}: {holder_counts[color_id]} {contained_bag_counts[color_id]}",
+                flush=True,
+            )
+
+
+# precompute both answers for every bag so each query is a list lookup
+# returns (holder_counts, contained_bag_counts), both indexed by bag ID
+def precompute_bag_answers(bag_graph):
+    color_ids, (offsets, children, child_counts), _ = bag_graph
+    bag_order = topological_bag_order(bag_graph)
+
+    # every bag's transitive containers as a bitset over bag IDs: a bag can
+    # be held by its direct containers and by anything that can hold them
+    holders = [0] * len(color_ids)
+    for bag_id in bag_order:
+        bag_and_holders = holders[bag_id] | (1 << bag_id)
+        for child_id in children[offsets[bag_id] : offsets[bag_id + 1]]:
+            holders[child_id] |= bag_and_holders
+    holder_counts = [bag_holders.bit_count() for bag_holders in holders]
+
+    # bags inside a bag only depend on bags further down the order
+    contained_bag_counts = [0] * len(color_ids)
+    for bag_id in reversed(bag_order):
+        contained_bag_counts[bag_id] = sum(
+            child_counts[edge] * (1 + contained_bag_counts[children[edge]])
+            for edge in range(offsets[bag_id], offsets[bag_id + 1])
         )
 
-    return total_contained_bags
+    return (holder_counts, contained_bag_counts)
 
 
-# some counting recursion for fun
-# do I need it? who knows!
-def count_bag_and_child_bags(target_color, all_bag_rules, curr_color):
-    curr_bag_rules = all_bag_rules[curr_color]
-    if not curr_bag_rules:
-        return 0
+# order bag IDs so that every bag comes before the bags it contains
+def topological_bag_order(bag_graph):
+    color_ids, (offsets, children, _), (container_offsets, _, _) = bag_graph
 
-    contained_bag_count = 0
-    for color in curr_bag_rules:
-        child_bag_count = curr_bag_rules[color]
-        contained_bag_count += child_bag_count + (
-            child_bag_count
-            * count_bag_and_child_bags(target_color, all_bag_rules, color)
-        )
+    unplaced_containers = [
+        container_offsets[bag_id + 1] - container_offsets[bag_id]
+        for bag_id in range(len(color_ids))
+    ]
+    bag_order = [
+        bag_id
+        for bag_id, container_count in enumerate(unplaced_containers)
+        if container_count == 0
+    ]
+    for bag_id in bag_order:
+        for child_id in children[offsets[bag_id] : offsets[bag_id + 1]]:
+            unplaced_containers[child_id] -= 1
+            if unplaced_containers[child_id] == 0:
+                bag_order.append(child_id)
+
+    if len(bag_order) != len(color_ids):
+        raise Exception("Bag rules contain a cycle")
 
-    return contained_bag_count
+    return bag_order
 
 
 if __name__ == "__main__":
@@ -40,90 +40,264 @@
 
 # Run your copy of the boot code. Immediately before any instruction is executed a second time, what value is in the accumulator?
 
-import copy
+from array import array
 import sys
 
 
 def main():
+    # usage: day8.py <input file> [--trace] [--trace-file <output file>]
     input_file = sys.argv[1]
     try:
         with open(input_file) as file_reader:
             instructions = [line.rstrip() for line in file_reader.readlines()]
-            print(run_instructions(instructions))
-            print(find_accumulator_without_corrupt_instruction(instructions))
+
+        program = Program(instructions)
+        trace = None
+        if "--trace" in sys.argv[2:] or "--trace-file" in sys.argv[2:]:
+            trace = ExecutionTrace(len(program))
+
+        print(program.run(trace=trace))
+        print(find_accumulator_without_corrupt_instruction(program))
+
+        if "--trace" in sys.argv[2:]:
+            print(trace.summary(program))
+        if "--trace-file" in sys.argv[2:]:
+            trace_file = sys.argv[sys.argv.index("--trace-file") + 1]
+            with open(trace_file, "wb") as trace_writer:
+                trace.write(trace_writer)
 
     except Exception as error:
         print(error)
 
 
-# returns a tuple:
-# wether or not the instructions result in an infinite loop (true/false), the value of the accumulator before execution halted
-def run_instructions(instructions):
-    accumulator = 0
-    executed_instructions = []
-    next_instruction_index = 0
-
-    # execute instructions until we hit a loop (an instruction we've already executed)
-    # or until or next instruction is out of range (aka we run all the instructions)
-    while (
-        not next_instruction_index in executed_instructions
-        and next_instruction_index < len(instructions)
-    ):
-        executed_instructions.append(next_instruction_index)
-
-        # action format: <3 letter action> <+/-><int>
-        # sample actions:
-        # nop +0, jmp -3, acc +1
-        action, raw_action_value = tuple(instructions[next_instruction_index].split())
-
-        # convert value to an int
-        action_value = int(raw_action_value)
-
-        # do action
-        if action == "nop":
-            # no-op - go to next instruction
-            next_instruction_index += 1
-        elif action == "acc":
-            # add to accumulator
-            accumulator += action_value
+# opcodes for the decoded program
+NOP = 0
+ACC = 1
+JMP = 2
+OPCODES = {"nop": NOP, "acc": ACC, "jmp": JMP}
+OPCODE_NAMES = {opcode: action for action, opcode in OPCODES.items()}
+# a corrupted instruction is a nop that should be a jmp or vice versa
+FLIPPED_OPCODES = {NOP: JMP, ACC: ACC, JMP: NOP}
+
+
+# a boot code program decoded once into parallel opcode/operand arrays,
+# so running it never has to re-split or re-parse an instruction
+class Program:
+    def __init__(self, instructions):
+        self.opcodes = bytearray(len(instructions))
+        self.operands = array("q", [0]) * len(instructions)
+
+        for index, instruction in enumerate(instructions):
+            # action format: <3 letter action> <+/-><int>
+            # sample actions:
+            # nop +0, jmp -3, acc +1
+            action, raw_action_value = instruction.split()
+            if action not in OPCODES:
+                raise Exception(f"Invalid instruction value {action}")
+            self.opcodes[index] = OPCODES[action]
+            self.operands[index] = int(raw_action_value)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    # index of the instruction execution moves on to from index,
+    # treating that instruction as the given opcode
+    def next_instruction_index(self, index, opcode):
+        if opcode == JMP:
+            return index + self.operands[index]
+        return index + 1
+
+    # returns a tuple:
+    # wether or not the program results in an infinite loop (true/false), the value of the accumulator before execution halted
+    # flipped_index optionally runs the program with that nop/jmp swapped, without modifying it
+    # trace optionally records the run into an ExecutionTrace; untraced runs
+    # take a separate loop so they pay nothing for it
+    def run(self, flipped_index=None, trace=None):
+        if trace is not None:
+            return self.run_traced(flipped_index, trace)
+
+        opcodes = self.opcodes
+        operands = self.operands
+        program_length = len(opcodes)
+        executed = bytearray(program_length)
+        accumulator = 0
+        next_instruction_index = 0
+
+        # execute instructions until we hit a loop (an instruction we've already executed)
+        # or until or next instruction is out of range (aka we run all the instructions)
+        while 0 <= next_instruction_index < program_length:
+            if executed[next_instruction_index]:
+                return (True, accumulator)
+            executed[next_instruction_index] = 1
+
+            opcode = opcodes[next_instruction_index]
+            if next_instruction_index == flipped_index:
+                opcode = FLIPPED_OPCODES[opcode]
+            if opcode == JMP:
+                # jump to instruction indicated by value
+                next_instruction_index += operands[next_instruction_index]
+                continue
+            if opcode == ACC:
+                # add to accumulator
+                accumulator += operands[next_instruction_index]
             # go to next instruction
             next_instruction_index += 1
-        elif action == "jmp":
-            # jump to instruction indicated by value
-            next_instruction_index += action_value
-        else:
-            raise Exception(f"Invalid instruction value {action}")
 
-    instruction_loop = next_instruction_index in executed_instructions
-    return (instruction_loop, accumulator)
+        return (False, accumulator)
+
+    # same as run, but records every executed step into trace
+    def run_traced(self, flipped_index, trace):
+        opcodes = self.opcodes
+        operands = self.operands
+        program_length = len(opcodes)
+        executed = bytearray(program_length)
+        accumulator = 0
+        next_instruction_index = 0
+
+        while 0 <= next_instruction_index < program_length:
+            index = next_instruction_index
+            if executed[index]:
+                trace.repeated_instruction = index
+                return (True, accumulator)
+            executed[index] = 1
+
+            opcode = opcodes[index]
+            if index == flipped_index:
+                opcode = FLIPPED_OPCODES[opcode]
+            accumulator_delta = 0
+            if opcode == JMP:
+                next_instruction_index += operands[index]
+            else:
+                if opcode == ACC:
+                    accumulator_delta = operands[index]
+                    accumulator += accumulator_delta
+                next_instruction_index += 1
+
+            trace.record(index, accumulator_delta, next_instruction_index)
 
+        return (False, accumulator)
 
-# with the given instructions, one no-op or jump instruction can be altered
+
+# per-instruction profile of a program run:
+# how often each instruction ran, how much it moved the accumulator in total,
+# which instructions were entered by jumping backwards (loop entry points),
+# the order instructions ran in, and the instruction that would have repeated
+class ExecutionTrace:
+    def __init__(self, program_length):
+        self.hit_counts = array("q", [0]) * program_length
+        self.accumulator_deltas = array("q", [0]) * program_length
+        self.loop_entries = {}
+        self.executed_order = array("i")
+        self.repeated_instruction = None
+
+    def record(self, index, accumulator_delta, next_instruction_index):
+        self.hit_counts[index] += 1
+        self.accumulator_deltas[index] += accumulator_delta
+        self.executed_order.append(index)
+        if next_instruction_index <= index:
+            self.loop_entries[next_instruction_index] = (
+                self.loop_entries.get(next_instruction_index, 0) + 1
+            )
+
+    # table of the most executed instructions, plus loop entry points
+    def summary(self, program, limit=10):
+        hot_instructions = sorted(
+            (index for index, hits in enumerate(self.hit_counts) if hits > 0),
+            key=lambda index: (-self.hit_counts[index], index),
+        )[:limit]
+
+        lines = [f"{'index':>7} {'instruction':<12} {'hits':>8} {'acc delta':>10}"]
+        for index in hot_instructions:
+            instruction = (
+                f"{OPCODE_NAMES[program.opcodes[index]]} {program.operands[index]:+d}"
+            )
+            lines.append(
+                f"{index:>7} {instruction:<12} {self.hit_counts[index]:>8} "
+                f"{self.accumulator_deltas[index]:>10}"
+            )
+
+        lines.append(f"steps: {len(self.executed_order)}")
+        loop_entries = ", ".join(
+            f"{index} ({entries}x)"
+            for index, entries in sorted(self.loop_entries.items())
+        )
+        lines.append(f"loop entries: {loop_entries or 'none'}")
+        if self.repeated_instruction is not None:
+            lines.append(f"repeated instruction: {self.repeated_instruction}")
+        return "\n".join(lines)
+
+    # compact binary trace: the executed instruction indexes, in order, as
+    # native-endian 32-bit signed integers
+    def write(self, trace_writer):
+        self.executed_order.tofile(trace_writer)
+
+
+# returns a tuple:
+# wether or not the instructions result in an infinite loop (true/false), the value of the accumulator before execution halted
+def run_instructions(instructions):
+    return Program(instructions).run()
+
+
+# with the given program, one no-op or jump instruction can be altered
 # to remove the infinite loop and run the instructions completely
-def find_accumulator_without_corrupt_instruction(instructions):
-    for index, instruction in enumerate(instructions):
-        action = instruction[0:3]
-
-        # if the instruction is an acc, we can skip it
-        if action == "acc":
-            continue
-
-        # make a new copy of the instructions each iteration, to avoid modifying the og
-        instruction_copy = copy.deepcopy(instructions)
-
-        # if the action is a no-op or jump, switch it to the other type
-        # and run the instructions to see if the loop is fixed
-        if action == "nop":
-            instruction_copy[index] = "jmp" + instruction[3:]
-        elif action == "jmp":
-            instruction_copy[index] = "nop" + instruction[3:]
+def find_accumulator_without_corrupt_instruction(program):
+    flipped_index = find_corrupt_instruction(program)
+    if flipped_index is None:
+        return None
+
+    _, accumulator = program.run(flipped_index)
+    return accumulator
+
+
+# find the nop/jmp whose flip lets the program terminate, in O(n):
+# first work out every instruction that already runs off the end of the
+# program unchanged, then walk the original (looping) execution path and
+# flip the first nop/jmp whose flipped target is one of those instructions
+def find_corrupt_instruction(program):
+    terminates = find_terminating_instructions(program)
+    program_length = len(program)
+
+    executed = bytearray(program_length)
+    index = 0
+    while 0 <= index < program_length and not executed[index]:
+        executed[index] = 1
+        opcode = program.opcodes[index]
+        if opcode != ACC:
+            flipped_target = program.next_instruction_index(
+                index, FLIPPED_OPCODES[opcode]
+            )
+            if not 0 <= flipped_target < program_length or terminates[flipped_target]:
+                return index
+        index = program.next_instruction_index(index, opcode)
+
+    return None
+
+
+# bytearray marking every instruction that leads out of the program as written
+def find_terminating_instructions(program):
+    program_length = len(program)
+
+    # reverse edges: which instructions lead into each instruction
+    leads_into = [[] for _ in range(program_length)]
+    terminates = bytearray(program_length)
+    instructions_to_visit = []
+    for index, opcode in enumerate(program.opcodes):
+        target = program.next_instruction_index(index, opcode)
+        if 0 <= target < program_length:
+            leads_into[target].append(index)
         else:
-            raise Exception(f"Invalid instruction value {action}")
+            terminates[index] = 1
+            instructions_to_visit.append(index)
 
-        has_loop, accumulator = run_instructions(instruction_copy)
+    # anything leading into a terminating instruction terminates as well
+    while instructions_to_visit:
+        index = instructions_to_visit.pop()
+        for source in leads_into[index]:
+            if not terminates[source]:
+                terminates[source] = 1
+                instructions_to_visit.append(source)
 
-        if not has_loop:
-            return accumulator
+    return terminates
 
 
 if __name__ == "__main__":
@@ -26,6 +26,7 @@
 
 # To find the encryption weakness, add together the smallest and largest number in this contiguous range.
 
+from collections import Counter, deque
 import sys
 
 TEST_SEQUENCE_LENGTH = 5  # used for test1.txt
@@ -33,82 +34,123 @@ PROBLEM_SEQUENCE_LENGTH = 25  # used for test2.txt
 
 
 def main():
+    # usage: day9.py <input file> [sequence length]
     input_file = sys.argv[1]
     try:
+        sequence_length = (
+            int(sys.argv[2]) if len(sys.argv) > 2 else PROBLEM_SEQUENCE_LENGTH
+        )
         with open(input_file) as file_reader:
             numbers = [int(line) for line in file_reader.readlines()]
-            print(find_first_invalid_number(numbers, PROBLEM_SEQUENCE_LENGTH))
-            print(break_xmas_encryption(numbers, PROBLEM_SEQUENCE_LENGTH))
+            print(find_first_invalid_number(numbers, sequence_length))
+            print(break_xmas_encryption(numbers, sequence_length))
     except Exception as error:
         print(error)
 
 
+# the last sequence_length numbers seen, kept both in arrival order (so the
+# oldest can be evicted in O(1)) and as a value -> count index (so pair
+# sums can be checked without a double loop)
+class SumWindow:
+    def __init__(self, sequence_length):
+        self.sequence_length = sequence_length
+        self.numbers = deque()
+        self.number_counts = Counter()
+
+    def is_full(self):
+        return len(self.numbers) >= self.sequence_length
+
+    def push(self, number):
+        if self.is_full():
+            evicted_number = self.numbers.popleft()
+            self.number_counts[evicted_number] -= 1
+            if self.number_counts[evicted_number] == 0:
+                del self.number_counts[evicted_number]
+        self.numbers.append(number)
+        self.number_counts[number] += 1
+
+    # is candidate_number the sum of two numbers at different spots in the window?
+    def has_pair_sum(self, candidate_number):
+        for number in self.number_counts:
+            complement = candidate_number - number
+            # a number can only pair with itself if it is in the window twice
+            needed = 2 if complement == number else 1
+            if self.number_counts.get(complement, 0) >= needed:
+                return True
+        return False
+
+
 def break_xmas_encryption(numbers, sequence_length):
     # step 1: find the first invalid number
     # (good thing we did that in part 1, eh?)
     invalid_number = find_first_invalid_number(numbers, sequence_length)
 
     # step 2: find the first continuous sub-list of numbers that sum to invalid number
-    continuous_numbers = find_continuous_sequence_for_target_sum(
-        numbers, invalid_number
-    )
+    sequence_bounds = find_continuous_sequence_for_target_sum(numbers, invalid_number)
+    if sequence_bounds is None:
+        raise Exception(
+            f"No continuous sequence of numbers adds up to {invalid_number}"
+        )
 
     # step 3 return the sum of the min and max of the sub-list from step 2
+    start_index, end_index = sequence_bounds
+    continuous_numbers = [numbers[i] for i in range(start_index, end_index)]
     return min(continuous_numbers) + max(continuous_numbers)
 
 
 # first invalid number == first number that is not the sum of two numbers in the
 # immediately preceding sequence of sequence_length numbers
 def find_first_invalid_number(numbers, sequence_length):
-    # keep track of where we are in the list, so we can always grab the
-    # sequence_length list of numbers immediately preceding the candidate
-    offset = 0
-
-    # the first sequence_length numbers do not need to be considered
-    for candidate_number in numbers[sequence_length:]:
-        sequence = numbers[offset : sequence_length + offset]
-        candidate_is_valid = False
-
-        # sum every number with ever other number (sliding up the list)
-        # until we find two numbers that sum to the candidate number
-        for i in range(sequence_length):
-            sequence_i = sequence[i]
-            if sequence_i > candidate_number:
-                continue
-            for j in range(i + 1, sequence_length):
-                sequence_j = sequence[j]
-                if sequence_i + sequence_j == candidate_number:
-                    candidate_is_valid = True
-                    break
-
-        # no two numbers in the sequence could add up to the candidate?
-        # we've got our invalid number; return it
-        if not candidate_is_valid:
+    window = SumWindow(sequence_length)
+    for candidate_number in numbers:
+        # the first sequence_length numbers do not need to be considered
+        if window.is_full() and not window.has_pair_sum(candidate_number):
+            # no two numbers in the sequence could add up to the candidate?
+            # we've got our invalid number; return it
             return candidate_number
 
-        # move on to the next candidate number
-        offset += 1
+        # slide the window on to include the candidate
+        window.push(candidate_number)
 
 
-# return the sub-list of continuous numbers from a larger list that
-# add up to the given target_sum
+# return the (start, end) bounds of the first sub-list of at least two
+# continuous numbers that add up to the given target_sum, end exclusive,
+# or None if there isn't one
 def find_continuous_sequence_for_target_sum(numbers, target_sum):
-    for i in range(len(numbers)):
-        running_sum = 0
-
-        # keep track of the start + end of our sub-list
-        start_index = i
-        end_index = i
-
-        # sum numbers until we meet or exceed the target, or can't sum any more numbers
-        while running_sum < target_sum and end_index < len(numbers[start_index:]):
-            running_sum += numbers[end_index]
-            end_index += 1
-
-        if running_sum == target_sum:
-            return numbers[start_index:end_index]
-
-    return []
+    # the numbers are all positive, so a single window slides over the list:
+    # grow it on the right, and shrink it from the left while it's too big
+    start_index = 0
+    running_sum = 0
+    for end_index, number in enumerate(numbers):
+        running_sum += number
+        while running_sum > target_sum and start_index < end_index:
+            running_sum -= numbers[start_index]
+            start_index += 1
+
+        if running_sum == target_sum and end_index > start_index:
+            return (start_index, end_index + 1)
+
+    return None
+
+
+# same as find_continuous_sequence_for_target_sum, but for a stream of numbers
+# too large to hold: only the current window is kept, and it is returned
+# along with the bounds as (start, end, window numbers)
+def find_continuous_sequence_in_stream(numbers, target_sum):
+    window = deque()
+    start_index = 0
+    running_sum = 0
+    for end_index, number in enumerate(numbers):
+        window.append(number)
+        running_sum += number
+        while running_sum > target_sum and len(window) > 1:
+            running_sum -= window.popleft()
+            start_index += 1
+
+        if running_sum == target_sum and len(window) > 1:
+            return (start_index, end_index + 1, list(window))
+
+    return None
 
 
 if __name__ == "__main__":